@@ -1,24 +1,316 @@
-from fastapi import FastAPI, Query, HTTPException, status
+from fastapi import FastAPI, Query, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, List, Dict, Any
+from fastapi.responses import ORJSONResponse
+from typing import Optional, List, Dict, Any, Literal, NamedTuple, Tuple
 from pydantic import BaseModel, Field
-import json
+import asyncio
+import heapq
 import math
+import os
+import re
+import sys
+from functools import lru_cache
+import numpy as np
+import orjson
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import uuid4
 
-# Helper to perform case-insensitive substring matching
-def _matches(value: Optional[str], query: str) -> bool:
-    if value is None:
-        return False
-    return query.lower() in value.lower()
+try:
+    # Optional accelerator for the cold-start catalog parse: pysimdjson
+    # exposes simdjson's SIMD structural scanner. The document is
+    # materialized recursively because the index builds below touch every
+    # field anyway; without the bindings, orjson parses the catalog.
+    import simdjson
+
+    _catalog_parser = simdjson.Parser()
+
+    def _parse_catalog(raw: bytes):
+        return _catalog_parser.parse(raw, recursive=True)
+except ImportError:
+    _parse_catalog = orjson.loads
+
+try:
+    # Optional accelerator: when numba is installed the price/rating range
+    # filters run as one fused JIT-compiled loop; otherwise the vectorized
+    # numpy mask path below is used.
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _numeric_range_mask(prices, ratings, min_price, max_price, min_rating):
+        n = prices.shape[0]
+        out = np.empty(n, dtype=np.bool_)
+        for i in range(n):
+            out[i] = (
+                prices[i] >= min_price
+                and prices[i] <= max_price
+                and ratings[i] >= min_rating
+            )
+        return out
+else:
+    _numeric_range_mask = None
+
+
+class ProductSearchIndex(NamedTuple):
+    """Parallel columns of pre-lowercased product fields, built once at startup.
+
+    Filtering and search compare against these cached strings instead of
+    calling .lower() on every product field for every request. The searched
+    fields (title, description, brand, tags) are pre-joined into a single
+    newline-separated haystack per product, so a search query is one
+    substring test per row; queries cannot span fields unless they contain
+    a newline themselves.
+    """
+    haystack: List[str]
+    category: List[str]
+    availability: List[str]
+
+
+class ProductColumns(NamedTuple):
+    """Structure-of-Arrays view of PRODUCTS for vectorized filter scans.
+
+    Numeric fields are contiguous float64 arrays; low-cardinality string
+    fields are dictionary-encoded as int32 id arrays plus the lowercased
+    distinct values (the id of a value is its position in the tuple).
+    """
+    prices: np.ndarray
+    ratings: np.ndarray
+    category_ids: np.ndarray
+    brand_ids: np.ndarray
+    availability_ids: np.ndarray
+    category_values: Tuple[str, ...]
+    brand_values: Tuple[str, ...]
+    availability_values: Tuple[str, ...]
+
+
+def _encode_column(values: List[str]) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """Dictionary-encode a string column into an int32 id array."""
+    ids: Dict[str, int] = {}
+    encoded = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        encoded[i] = ids.setdefault(value, len(ids))
+    return encoded, tuple(ids)
+
+
+def _build_columns(products: List[Dict[str, Any]], index: ProductSearchIndex) -> ProductColumns:
+    prices = np.array([item.get("price", 0) or 0 for item in products], dtype=np.float64)
+    ratings = np.array([item.get("rating", 0) or 0 for item in products], dtype=np.float64)
+    category_ids, category_values = _encode_column(index.category)
+    brands_lower = [(item.get("brand") or "").lower() for item in products]
+    brand_ids, brand_values = _encode_column(brands_lower)
+    availability_ids, availability_values = _encode_column(index.availability)
+    return ProductColumns(
+        prices, ratings,
+        category_ids, brand_ids, availability_ids,
+        category_values, brand_values, availability_values,
+    )
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _build_token_postings(haystacks: List[str]) -> Dict[str, np.ndarray]:
+    """Build an inverted index: token -> sorted array of catalog rows.
+
+    A single-token search query can only match inside an unbroken run of
+    word characters, so answering it from the postings of every vocabulary
+    token containing the query is exactly equivalent to scanning the
+    haystacks. The vocabulary is orders of magnitude smaller than the
+    corpus, which is what makes the substring scan over tokens cheap.
+    """
+    postings: Dict[str, set] = {}
+    for i, hay in enumerate(haystacks):
+        for token in set(_TOKEN_RE.findall(hay)):
+            postings.setdefault(token, set()).add(i)
+    return {
+        token: np.fromiter(sorted(rows), dtype=np.int64, count=len(rows))
+        for token, rows in postings.items()
+    }
+
+
+def _token_search_rows(query_lower: str) -> np.ndarray:
+    """Union of postings for all vocabulary tokens containing the query."""
+    selected = [
+        posting for token, posting in TOKEN_POSTINGS.items() if query_lower in token
+    ]
+    if not selected:
+        return np.empty(0, dtype=np.int64)
+    if len(selected) == 1:
+        return selected[0]
+    return np.unique(np.concatenate(selected))
+
+
+class RangeIndex(NamedTuple):
+    """Presorted numeric column for O(log N + K) range queries.
+
+    sorted_values holds the column in ascending order and order maps each
+    sorted position back to its catalog row, so a [lo, hi] range becomes a
+    searchsorted window over sorted_values gathered through order.
+    """
+    sorted_values: np.ndarray
+    order: np.ndarray
+
+
+def _build_range_indexes(cols: ProductColumns) -> Dict[str, RangeIndex]:
+    indexes: Dict[str, RangeIndex] = {}
+    for field, values in (("price", cols.prices), ("rating", cols.ratings)):
+        order = np.argsort(values, kind="stable")
+        indexes[field] = RangeIndex(values[order], order)
+    return indexes
+
+
+def _range_candidates(
+    index: RangeIndex, low: Optional[float], high: Optional[float]
+) -> np.ndarray:
+    """Catalog rows whose value lies in [low, high], in catalog order."""
+    lo = np.searchsorted(index.sorted_values, low, side="left") if low is not None else 0
+    hi = (
+        np.searchsorted(index.sorted_values, high, side="right")
+        if high is not None else len(index.order)
+    )
+    return np.sort(index.order[lo:hi])
+
+
+def _build_sort_orders(products: List[Dict[str, Any]]) -> Dict[Tuple[str, bool], np.ndarray]:
+    """Precompute stable argsort index arrays for the numeric sort columns.
+
+    Keyed by (field, descending). Missing values sort last in both
+    directions, matching the request-time fallback key, and stable argsort
+    keeps ties in catalog order exactly like sorted() would.
+    """
+    orders: Dict[Tuple[str, bool], np.ndarray] = {}
+    for field in ("price", "rating", "stock", "discountPercentage"):
+        values = [item.get(field) for item in products]
+        asc_keys = np.array(
+            [v if isinstance(v, (int, float)) else np.inf for v in values], dtype=np.float64
+        )
+        desc_keys = np.array(
+            [v if isinstance(v, (int, float)) else -np.inf for v in values], dtype=np.float64
+        )
+        orders[(field, False)] = np.argsort(asc_keys, kind="stable")
+        orders[(field, True)] = np.argsort(-desc_keys, kind="stable")
+    return orders
+
+
+def _make_sort_key(sort_by: str, reverse: bool):
+    """Build the per-item sort key for columns without a precomputed order."""
+    missing = float('-inf') if reverse else float('inf')
+
+    def get_sort_key(i):
+        value = PRODUCTS[i].get(sort_by)
+        # Handle None values - put them at the end
+        if value is None:
+            return missing
+        # Convert to string for comparison if needed
+        if isinstance(value, (int, float)):
+            return value
+        return str(value).lower()
+
+    return get_sort_key
+
+
+@lru_cache(maxsize=256)
+def _parse_fields(fields: str) -> frozenset:
+    """Parse a ?fields= parameter into an interned frozenset of names.
+
+    Clients send the same handful of field lists over and over, so the
+    split/strip work and the resulting set are cached per distinct string.
+    """
+    return frozenset(sys.intern(f.strip()) for f in fields.split(","))
+
+
+def _page_response(
+    page: int,
+    limit: int,
+    total_items: int,
+    total_pages: int,
+    page_indices,
+    fields: Optional[str],
+) -> Dict[str, Any]:
+    """Materialize one page of products and build the /products response.
+
+    Only the rows in page_indices are ever touched; with field selection the
+    projected dicts are built straight from the catalog rows without an
+    intermediate full-row list.
+    """
+    if fields:
+        selected_fields = _parse_fields(fields)
+        paginated_data = [
+            {key: value for key, value in PRODUCTS[i].items() if key in selected_fields}
+            for i in page_indices
+        ]
+    else:
+        paginated_data = [PRODUCTS[i] for i in page_indices]
+
+    # Return 404 if no products found
+    if not paginated_data and page > total_pages and total_pages > 0:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Page {page} not found. Total pages: {total_pages}"
+        )
+
+    return {
+        "page": page,
+        "limit": limit,
+        "totalItems": total_items,
+        "totalPages": total_pages,
+        "data": paginated_data,
+    }
+
+
+def _combine_mask(mask: Optional[np.ndarray], predicate: np.ndarray) -> np.ndarray:
+    """AND a predicate mask into the running filter mask, in place.
+
+    The first predicate's result becomes the mask itself, so requests with
+    no active filters never allocate or traverse a full-length mask.
+    """
+    if mask is None:
+        return predicate
+    mask &= predicate
+    return mask
+
+
+def _substring_mask(query_lower: str, ids: np.ndarray, values: Tuple[str, ...]) -> np.ndarray:
+    """Boolean mask of rows whose encoded value contains query_lower.
+
+    The substring test only runs over the distinct values; the per-row work
+    is a vectorized id comparison.
+    """
+    matching = [i for i, value in enumerate(values) if query_lower in value]
+    if not matching:
+        return np.zeros(len(ids), dtype=bool)
+    if len(matching) == 1:
+        return ids == matching[0]
+    return np.isin(ids, matching)
+
+
+def _build_search_index(products: List[Dict[str, Any]]) -> ProductSearchIndex:
+    index = ProductSearchIndex([], [], [])
+    for item in products:
+        # Tags are joined with a unit separator so the tag part of the
+        # haystack is a single substring test instead of a Python loop over
+        # individual tags; the non-word separator keeps queries from
+        # matching across tag boundaries, like the newlines between fields.
+        tags_joined = "\x1f".join(str(tag).lower() for tag in item.get("tags") or [])
+        index.haystack.append("\n".join((
+            (item.get("title") or "").lower(),
+            (item.get("description") or "").lower(),
+            (item.get("brand") or "").lower(),
+            tags_joined,
+        )))
+        index.category.append((item.get("category") or "").lower())
+        index.availability.append((item.get("availabilityStatus") or "").lower())
+    return index
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Product API",
     description="REST API for product data with pagination, filtering, search, and sorting",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Enable CORS for all origins
@@ -32,8 +324,31 @@ app.add_middleware(
 
 # Load products data at startup
 PRODUCTS: List[Dict[str, Any]] = []
+SEARCH_INDEX: ProductSearchIndex = ProductSearchIndex([], [], [])
+COLUMNS: Optional[ProductColumns] = None
+SORT_ORDERS: Dict[Tuple[str, bool], np.ndarray] = {}
+RANGE_INDEXES: Dict[str, RangeIndex] = {}
+TOKEN_POSTINGS: Dict[str, np.ndarray] = {}
 ORDERS: List[Dict[str, Any]] = []
 
+# Persistent lookup indexes, built at startup and maintained on writes,
+# so the single-item and distinct-value endpoints avoid linear scans.
+PRODUCT_BY_ID: Dict[str, Dict[str, Any]] = {}
+ORDERS_BY_USER: Dict[str, List[Dict[str, Any]]] = {}
+CATEGORIES_SORTED: Tuple[str, ...] = ()
+BRANDS_SORTED: Tuple[str, ...] = ()
+CATEGORIES_BYTES: bytes = b""
+BRANDS_BYTES: bytes = b""
+
+# Serialized root payload, rebuilt lazily when the order count changes.
+_root_cache: Tuple[int, bytes] = (-1, b"")
+
+# Response cache for /products requests with no filters or search active.
+# PRODUCTS is immutable after startup, so entries never go stale; the cache
+# is simply cleared if it grows past the cap.
+_PAGE_CACHE: Dict[Tuple, Dict[str, Any]] = {}
+_PAGE_CACHE_MAX = 1024
+
 ORDERS_PATH = Path(__file__).parent / "orders.json"
 
 
@@ -41,46 +356,271 @@ def _load_orders() -> List[Dict[str, Any]]:
     if not ORDERS_PATH.exists():
         return []
     try:
-        with open(ORDERS_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("orders", [])
-    except (json.JSONDecodeError, OSError):
+        data = orjson.loads(ORDERS_PATH.read_bytes())
+        return data.get("orders", [])
+    except (orjson.JSONDecodeError, OSError):
         return []
 
 
-def _save_orders() -> None:
+# Order persistence runs in the background: the request handler only marks
+# the in-memory state dirty and schedules a writer task. Concurrent creates
+# coalesce into a single write, and the file is replaced atomically so a
+# crash mid-write never leaves a truncated orders.json.
+_orders_dirty = False
+_SAVE_LOCK = asyncio.Lock()
+_save_tasks: set = set()
+
+
+def _write_orders(payload: bytes) -> None:
     ORDERS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(ORDERS_PATH, "w", encoding="utf-8") as f:
-        json.dump({"orders": ORDERS}, f, ensure_ascii=False, indent=2)
+    tmp_path = ORDERS_PATH.with_name(ORDERS_PATH.name + ".tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, ORDERS_PATH)
+
+
+async def _save_orders() -> None:
+    global _orders_dirty
+    _orders_dirty = True
+    if _SAVE_LOCK.locked():
+        # The in-flight writer will pick this change up on its next pass.
+        return
+    async with _SAVE_LOCK:
+        while _orders_dirty:
+            _orders_dirty = False
+            # Snapshot on the event loop, write on a worker thread.
+            payload = orjson.dumps({"orders": ORDERS}, option=orjson.OPT_INDENT_2)
+            await asyncio.to_thread(_write_orders, payload)
+
+
+def _schedule_save_orders() -> None:
+    task = asyncio.get_running_loop().create_task(_save_orders())
+    _save_tasks.add(task)
+    task.add_done_callback(_save_tasks.discard)
 
 @app.on_event("startup")
 async def load_products():
     """Load products from db.json at startup"""
-    global PRODUCTS
+    global PRODUCTS, SEARCH_INDEX, COLUMNS
     db_path = Path(__file__).parent / "db.json"
-    with open(db_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        PRODUCTS = data.get("products", [])
+    data = _parse_catalog(db_path.read_bytes())
+    PRODUCTS = data.get("products", [])
+    SEARCH_INDEX = _build_search_index(PRODUCTS)
+    COLUMNS = _build_columns(PRODUCTS, SEARCH_INDEX)
+    if _numeric_range_mask is not None:
+        # Trigger JIT compilation before serving traffic
+        _numeric_range_mask(COLUMNS.prices, COLUMNS.ratings, -np.inf, np.inf, -np.inf)
+    global SORT_ORDERS, RANGE_INDEXES
+    SORT_ORDERS = _build_sort_orders(PRODUCTS)
+    RANGE_INDEXES = _build_range_indexes(COLUMNS)
+    global TOKEN_POSTINGS
+    TOKEN_POSTINGS = _build_token_postings(SEARCH_INDEX.haystack)
+    global PRODUCT_BY_ID, CATEGORIES_SORTED, BRANDS_SORTED
+    PRODUCT_BY_ID = {}
+    for item in PRODUCTS:
+        PRODUCT_BY_ID.setdefault(item.get("id"), item)
+    CATEGORIES_SORTED = tuple(sorted(
+        {item.get("category") for item in PRODUCTS if item.get("category")}
+    ))
+    BRANDS_SORTED = tuple(sorted(
+        {item.get("brand") for item in PRODUCTS if item.get("brand")}
+    ))
+    global CATEGORIES_BYTES, BRANDS_BYTES, _root_cache
+    CATEGORIES_BYTES = orjson.dumps({
+        "total": len(CATEGORIES_SORTED),
+        "categories": list(CATEGORIES_SORTED),
+    })
+    BRANDS_BYTES = orjson.dumps({
+        "total": len(BRANDS_SORTED),
+        "brands": list(BRANDS_SORTED),
+    })
+    _root_cache = (-1, b"")
+    _PAGE_CACHE.clear()
     print(f"Loaded {len(PRODUCTS)} products from db.json")
-    global ORDERS
+    global ORDERS, ORDERS_BY_USER
     ORDERS = _load_orders()
+    ORDERS_BY_USER = {}
+    for order in ORDERS:
+        ORDERS_BY_USER.setdefault(order.get("userId"), []).append(order)
     print(f"Loaded {len(ORDERS)} orders from orders.json")
 
 
+@app.on_event("shutdown")
+async def flush_orders():
+    """Wait for any pending background order write to reach disk"""
+    if _save_tasks:
+        await asyncio.gather(*list(_save_tasks), return_exceptions=True)
+
+
 @app.get("/")
 async def root():
-    """Root endpoint with API information"""
-    return {
-        "message": "Product API",
-        "version": "1.0.0",
-        "endpoints": {
-            "products": "/products",
-            "documentation": "/docs",
-            "redoc": "/redoc"
-        },
-        "total_products": len(PRODUCTS),
-        "total_orders": len(ORDERS),
-    }
+    """Root endpoint with API information, served from prebuilt bytes"""
+    global _root_cache
+    if _root_cache[0] != len(ORDERS):
+        payload = orjson.dumps({
+            "message": "Product API",
+            "version": "1.0.0",
+            "endpoints": {
+                "products": "/products",
+                "documentation": "/docs",
+                "redoc": "/redoc"
+            },
+            "total_products": len(PRODUCTS),
+            "total_orders": len(ORDERS),
+        })
+        _root_cache = (len(ORDERS), payload)
+    return Response(content=_root_cache[1], media_type="application/json")
+
+
+# Catalog size from which the /products scan is pushed onto a worker
+# thread instead of running on the event loop.
+_OFFLOAD_MIN_ROWS = 20_000
+
+
+def _query_products(
+    page: int,
+    limit: int,
+    search: Optional[str],
+    sortBy: Optional[str],
+    order: Literal["asc", "desc"],
+    fields: Optional[str],
+    category: Optional[str],
+    brand: Optional[str],
+    minPrice: Optional[float],
+    maxPrice: Optional[float],
+    minRating: Optional[float],
+    availabilityStatus: Optional[str],
+) -> Dict[str, Any]:
+    """Run the filter/search/sort pipeline and build one page of results.
+
+    Pure CPU work over the immutable startup-built indexes, so it is safe
+    to run on a worker thread.
+    """
+    idx = SEARCH_INDEX
+    cols = COLUMNS
+    price_active = minPrice is not None or maxPrice is not None
+    rating_active = minRating is not None
+
+    if (
+        price_active != rating_active
+        and category is None and brand is None and availabilityStatus is None
+    ):
+        # A lone numeric range filter is answered from the presorted column:
+        # two binary searches bound the window, then only the K in-range
+        # rows are gathered back into catalog order.
+        if price_active:
+            indices = _range_candidates(RANGE_INDEXES["price"], minPrice, maxPrice)
+        else:
+            indices = _range_candidates(RANGE_INDEXES["rating"], minRating, None)
+    else:
+        # Fuse the structured filters into a single boolean mask over the
+        # columnar arrays; each predicate is one vectorized pass in C,
+        # combined in place so intermediate lists are never rebuilt per
+        # filter.
+        mask: Optional[np.ndarray] = None
+
+        # Apply category filter
+        if category:
+            mask = _combine_mask(
+                mask, _substring_mask(category.lower(), cols.category_ids, cols.category_values)
+            )
+
+        # Apply brand filter
+        if brand:
+            mask = _combine_mask(
+                mask, _substring_mask(brand.lower(), cols.brand_ids, cols.brand_values)
+            )
+
+        # Apply price and rating range filters
+        if price_active or rating_active:
+            if _numeric_range_mask is not None:
+                # Fused JIT loop: one pass over both columns, inactive bounds
+                # become infinite sentinels.
+                mask = _combine_mask(mask, _numeric_range_mask(
+                    cols.prices,
+                    cols.ratings,
+                    minPrice if minPrice is not None else -np.inf,
+                    maxPrice if maxPrice is not None else np.inf,
+                    minRating if minRating is not None else -np.inf,
+                ))
+            else:
+                if minPrice is not None:
+                    mask = _combine_mask(mask, cols.prices >= minPrice)
+                if maxPrice is not None:
+                    mask = _combine_mask(mask, cols.prices <= maxPrice)
+                if minRating is not None:
+                    mask = _combine_mask(mask, cols.ratings >= minRating)
+
+        # Apply availability status filter
+        if availabilityStatus:
+            mask = _combine_mask(
+                mask,
+                _substring_mask(
+                    availabilityStatus.lower(), cols.availability_ids, cols.availability_values
+                ),
+            )
+
+        if mask is not None:
+            indices = np.flatnonzero(mask)
+        else:
+            # No structured filters: a range stands in for "all rows" without
+            # copying or materializing anything.
+            indices = range(len(PRODUCTS))
+
+    # Apply search
+    if search:
+        search_lower = search.lower()
+        if _TOKEN_RE.fullmatch(search_lower):
+            # Single-token query: answer from the inverted index and
+            # intersect with the surviving filter candidates.
+            rows = _token_search_rows(search_lower)
+            if isinstance(indices, range):
+                indices = rows
+            else:
+                indices = np.intersect1d(indices, rows, assume_unique=True)
+        else:
+            # Multi-word or punctuated query: one substring test per row
+            # against the pre-joined, pre-lowercased haystack.
+            haystack = idx.haystack
+            indices = [i for i in indices if search_lower in haystack[i]]
+
+    # Calculate pagination
+    total_items = len(indices)
+    total_pages = math.ceil(total_items / limit) if total_items > 0 else 0
+    start = (page - 1) * limit
+    end = start + limit
+
+    # Apply sorting
+    if sortBy:
+        reverse = order == "desc"
+        order_arr = SORT_ORDERS.get((sortBy, reverse))
+        if order_arr is not None:
+            # Numeric sort columns were argsorted at startup: either serve
+            # the precomputed order directly, or gather the surviving
+            # indices in sorted order without a comparison sort.
+            if isinstance(indices, range):
+                indices = order_arr
+            else:
+                keep = np.zeros(len(PRODUCTS), dtype=bool)
+                keep[indices] = True
+                indices = order_arr[keep[order_arr]]
+        else:
+            try:
+                get_sort_key = _make_sort_key(sortBy, reverse)
+                if end * 4 < total_items:
+                    # Only the first `end` items are ever served, so a top-k
+                    # heap selection beats sorting the whole candidate list.
+                    # nsmallest/nlargest keep the same stable tie ordering as
+                    # sorted().
+                    select = heapq.nlargest if reverse else heapq.nsmallest
+                    indices = select(end, indices, key=get_sort_key)
+                else:
+                    indices = sorted(indices, key=get_sort_key, reverse=reverse)
+            except (TypeError, KeyError):
+                # If sorting fails, just continue without sorting
+                pass
+
+    # Apply pagination and build response
+    return _page_response(page, limit, total_items, total_pages, indices[start:end], fields)
 
 
 @app.get("/products")
@@ -89,7 +629,7 @@ async def get_products(
     limit: int = Query(10, ge=1, le=100, description="Number of items per page"),
     search: Optional[str] = Query(None, description="Search in title, description, tags, and brand"),
     sortBy: Optional[str] = Query(None, description="Field to sort by (e.g., price, rating, title)"),
-    order: Optional[str] = Query("asc", regex="^(asc|desc)$", description="Sort order: asc or desc"),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort order: asc or desc"),
     fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
     # Dynamic filters
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -106,157 +646,80 @@ async def get_products(
     - Search: ?search=mascara
     - Sorting: ?sortBy=price&order=desc
     - Field selection: ?fields=id,title,price,brand
-    
+
     All filters can be combined.
     """
-    
-    # Start with all products
-    filtered_data = PRODUCTS.copy()
-    
-    # Apply category filter
-    if category:
-        filtered_data = [
-            item for item in filtered_data 
-            if _matches(item.get("category"), category)
-        ]
-    
-    # Apply brand filter
-    if brand:
-        filtered_data = [
-            item for item in filtered_data 
-            if _matches(item.get("brand"), brand)
-        ]
-    
-    # Apply price range filters
-    if minPrice is not None:
-        filtered_data = [
-            item for item in filtered_data 
-            if item.get("price", 0) >= minPrice
-        ]
-    
-    if maxPrice is not None:
-        filtered_data = [
-            item for item in filtered_data 
-            if item.get("price", 0) <= maxPrice
-        ]
-    
-    # Apply rating filter
-    if minRating is not None:
-        filtered_data = [
-            item for item in filtered_data 
-            if item.get("rating", 0) >= minRating
-        ]
-    
-    # Apply availability status filter
-    if availabilityStatus:
-        filtered_data = [
-            item for item in filtered_data 
-            if _matches(item.get("availabilityStatus"), availabilityStatus)
-        ]
-    
-    # Apply search
-    if search:
-        search_lower = search.lower()
-        filtered_data = [
-            item for item in filtered_data
-            if (
-                search_lower in (item.get("title") or "").lower()
-                or search_lower in (item.get("description") or "").lower()
-                or search_lower in (item.get("brand") or "").lower()
-                or any(search_lower in str(tag).lower() for tag in item.get("tags") or [])
+
+    # Requests with no filters or search only depend on the static catalog,
+    # so their fully-built responses can be served from cache.
+    unfiltered = (
+        category is None and brand is None and minPrice is None and maxPrice is None
+        and minRating is None and availabilityStatus is None and search is None
+    )
+    cache_key = (page, limit, sortBy, order, fields)
+    if unfiltered:
+        cached = _PAGE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        # Fast path: with no filters the result set is the whole catalog,
+        # so the page can be cut straight from the identity order (or a
+        # precomputed sort order) in O(limit) without any scan.
+        if sortBy:
+            # The Literal constraint guarantees order is already lowercase
+            fast_indices = SORT_ORDERS.get((sortBy, order == "desc"))
+        else:
+            fast_indices = range(len(PRODUCTS))
+        if fast_indices is not None:
+            total_items = len(PRODUCTS)
+            total_pages = math.ceil(total_items / limit) if total_items > 0 else 0
+            start = (page - 1) * limit
+            response = _page_response(
+                page, limit, total_items, total_pages,
+                fast_indices[start:start + limit], fields,
             )
-        ]
-    
-    # Apply sorting
-    if sortBy:
-        reverse = order.lower() == "desc"
-        try:
-            # Handle nested fields and missing values
-            def get_sort_key(item):
-                value = item.get(sortBy)
-                # Handle None values - put them at the end
-                if value is None:
-                    return float('inf') if not reverse else float('-inf')
-                # Convert to string for comparison if needed
-                if isinstance(value, (int, float)):
-                    return value
-                return str(value).lower()
-            
-            filtered_data = sorted(filtered_data, key=get_sort_key, reverse=reverse)
-        except (TypeError, KeyError):
-            # If sorting fails, just continue without sorting
-            pass
-    
-    # Calculate pagination
-    total_items = len(filtered_data)
-    total_pages = math.ceil(total_items / limit) if total_items > 0 else 0
-    
-    # Apply pagination
-    start = (page - 1) * limit
-    end = start + limit
-    paginated_data = filtered_data[start:end]
-    
-    # Apply field selection
-    if fields:
-        selected_fields = [f.strip() for f in fields.split(",")]
-        paginated_data = [
-            {key: value for key, value in item.items() if key in selected_fields}
-            for item in paginated_data
-        ]
-    
-    # Return 404 if no products found
-    if not paginated_data and page > total_pages and total_pages > 0:
-        raise HTTPException(
-            status_code=404, 
-            detail=f"Page {page} not found. Total pages: {total_pages}"
+            if len(_PAGE_CACHE) >= _PAGE_CACHE_MAX:
+                _PAGE_CACHE.clear()
+            _PAGE_CACHE[cache_key] = response
+            return response
+
+    if len(PRODUCTS) >= _OFFLOAD_MIN_ROWS:
+        # Large catalogs: run the scan on a worker thread so a slow filter
+        # pass does not stall the event loop for concurrent requests. The
+        # pipeline only reads immutable startup-built state.
+        response = await asyncio.to_thread(
+            _query_products, page, limit, search, sortBy, order, fields,
+            category, brand, minPrice, maxPrice, minRating, availabilityStatus,
         )
-    
-    # Build response
-    return {
-        "page": page,
-        "limit": limit,
-        "totalItems": total_items,
-        "totalPages": total_pages,
-        "data": paginated_data,
-    }
+    else:
+        # Small catalogs finish faster than a thread handoff would take
+        response = _query_products(
+            page, limit, search, sortBy, order, fields,
+            category, brand, minPrice, maxPrice, minRating, availabilityStatus,
+        )
+    if unfiltered:
+        if len(_PAGE_CACHE) >= _PAGE_CACHE_MAX:
+            _PAGE_CACHE.clear()
+        _PAGE_CACHE[cache_key] = response
+    return response
 
 
 @app.get("/products/categories")
 async def get_categories():
     """Get all unique categories"""
-    categories = list(set(
-        product.get("category") 
-        for product in PRODUCTS 
-        if product.get("category")
-    ))
-    return {
-        "total": len(categories),
-        "categories": sorted(categories)
-    }
+    return Response(content=CATEGORIES_BYTES, media_type="application/json")
 
 
 @app.get("/products/brands")
 async def get_brands():
     """Get all unique brands"""
-    brands = list(set(
-        product.get("brand") 
-        for product in PRODUCTS 
-        if product.get("brand")
-    ))
-    return {
-        "total": len(brands),
-        "brands": sorted(brands)
-    }
+    return Response(content=BRANDS_BYTES, media_type="application/json")
 
 
 @app.get("/products/{product_id}")
 async def get_product_by_id(product_id: str):
     """Get a single product by ID"""
-    product = next(
-        (item for item in PRODUCTS if item.get("id") == product_id),
-        None
-    )
-    
+    product = PRODUCT_BY_ID.get(product_id)
+
     if not product:
         raise HTTPException(status_code=404, detail=f"Product with id '{product_id}' not found")
     
@@ -279,36 +742,47 @@ class OrderCreate(BaseModel):
 
 
 class Order(OrderCreate):
+    """Shape of a stored order record: the validated OrderCreate payload
+    plus the server-assigned fields.
+
+    Records are assembled as plain dicts in create_order; this model is
+    kept as the documented layout of what ORDERS and orders.json hold.
+    """
     id: str = Field(..., description="Unique order identifier")
     createdAt: datetime = Field(..., description="Timestamp when the order was created")
 
 
-@app.post("/orders", response_model=Order, status_code=status.HTTP_201_CREATED)
+@app.post("/orders", status_code=status.HTTP_201_CREATED)
 async def create_order(order: OrderCreate):
-    """Create a new order"""
-    new_order = Order(
-        id=str(uuid4()),
-        createdAt=datetime.utcnow(),
-        **order.model_dump()
-    )
-    ORDERS.append(new_order.model_dump(mode="json"))
-    _save_orders()
-    return new_order
+    """Create a new order.
+
+    The request body is already validated as OrderCreate, so the stored
+    record (the Order shape) is assembled directly instead of being
+    round-tripped through a second model validation and re-dump.
+    """
+    order_record = order.model_dump(mode="json")
+    order_record["id"] = str(uuid4())
+    order_record["createdAt"] = datetime.now(timezone.utc).isoformat()
+    ORDERS.append(order_record)
+    ORDERS_BY_USER.setdefault(order.userId, []).append(order_record)
+    _schedule_save_orders()
+    return order_record
 
 
-@app.get("/orders", response_model=List[Order])
+@app.get("/orders")
 async def list_orders():
-    """Retrieve all orders"""
-    return [Order(**order) for order in ORDERS]
+    """Retrieve all orders.
 
+    Records come from this service's own write path (create_order validates
+    the body before assembling the stored dict), and orders.json is trusted
+    as that path's prior output, so they are returned as-is rather than
+    re-parsed per request.
+    """
+    return ORDERS
 
-@app.get("/users/{user_id}/orders", response_model=List[Order])
+
+@app.get("/users/{user_id}/orders")
 async def get_orders_by_user(user_id: str):
     """Retrieve all orders for a specific user"""
-    user_orders = [
-        Order(**order)
-        for order in ORDERS
-        if order.get("userId") == user_id
-    ]
-    return user_orders
+    return ORDERS_BY_USER.get(user_id, [])
 